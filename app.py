@@ -29,6 +29,10 @@ sys.path.insert(0, str(src_path))
 if __name__ == "__main__":
     import streamlit.web.cli as stcli
     
+    # Compile the estimator kernels (if Numba is installed) before the
+    # server starts; the app process then loads them from the disk cache
+    import kernels  # noqa: F401
+    
     # Path to the streamlit app
     app_path = src_path / 'app_main.py'
     
@@ -0,0 +1,50 @@
+"""
+Shared Utilities Module
+=======================
+
+Small numeric helpers shared by the calculation modules.
+
+Author: edujbarrios
+"""
+
+import math
+
+
+def round1(value: float) -> float:
+    """
+    Round a value to 1 decimal place.
+    
+    Scales and rounds half-to-even exactly like np.round(value, 1), but
+    as plain float arithmetic instead of the decimal-string rounding
+    path used by round(value, 1). NaN and infinity are returned
+    unchanged, as np.round does.
+    
+    Args:
+        value: Value to round
+        
+    Returns:
+        Rounded value
+    """
+    value = float(value)
+    if not math.isfinite(value):
+        return value
+    return round(value * 10) / 10
+
+
+def round2(value: float) -> float:
+    """
+    Round a value to 2 decimal places.
+    
+    Same rounding rule (and non-finite handling) as round1, used for
+    standard deviation.
+    
+    Args:
+        value: Value to round
+        
+    Returns:
+        Rounded value
+    """
+    value = float(value)
+    if not math.isfinite(value):
+        return value
+    return round(value * 100) / 100
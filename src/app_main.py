@@ -9,6 +9,7 @@ Author: edujbarrios
 """
 
 import streamlit as st
+import numpy as np
 import sys
 from pathlib import Path
 
@@ -19,49 +20,143 @@ if str(src_path) not in sys.path:
 
 from iop_calculator import IOPCalculator
 from validation import validate_measurements
-from interpretation import get_status_color
+from interpretation import interpret_iop, get_confidence_note, get_status_color
 from config import STREAMLIT_CONFIG, MIN_MEASUREMENTS
 
 
+# Static page content, built once at import
+_CSS = """
+<style>
+.main {
+    background-color: #0e1117;
+}
+.stAlert {
+    background-color: #262730;
+}
+h1, h2, h3 {
+    color: #fafafa;
+    font-family: 'Segoe UI', sans-serif;
+}
+.medical-card {
+    background-color: #262730;
+    padding: 20px;
+    border-radius: 5px;
+    border-left: 4px solid #1f77b4;
+    margin: 10px 0;
+}
+.primary-result {
+    background-color: #1a4d2e;
+    padding: 15px;
+    border-radius: 5px;
+    border: 2px solid #4ade80;
+}
+</style>
+"""
+
+_HEADER_HTML = """
+<h1 style='text-align: center;'>Real IOP Estimator</h1>
+<p style='text-align: center; color: #888;'>Robust intraocular pressure estimation from multiple measurements</p>
+<br>
+"""
+
+_DISCLAIMER_HTML = """
+---
+
+### ⚠️ Disclaimer
+
+<p style='font-size: 14px; color: #888;'><b>NOT a medical device. NOT for diagnosis.</b></p>
+<p style='font-size: 14px; color: #888;'>Does NOT replace clinical judgment. Author assumes NO LIABILITY.</p>
+<p style='font-size: 14px; color: #888;'>Consult a qualified ophthalmologist for medical advice.</p>
+
+---
+
+### ℹ️ About
+
+<p style='font-size: 14px; color: #888;'>This tool uses robust statistical methods to estimate real IOP from multiple iCare tonometer measurements.</p>
+<p style='font-size: 14px; color: #888;'><b>Safe IOP</b> (trimmed mean) is the primary and most reliable estimate.</p>
+"""
+
+_WELCOME_HTML = """
+<div style='text-align: center; padding: 40px 20px;'>
+    <p style='font-size: 16px; color: #888;'>Enter your measurements above and click the button to calculate</p>
+</div>
+"""
+
+# Additional estimates: (label, method, result key, formula)
+_SECONDARY_ESTIMATES = (
+    ("Trimean IOP", "Tukey's Method", 'trimean_iop',
+     r"IOP_{trimean} = \frac{Q_1 + 2 \cdot \text{Median} + Q_3}{4}"),
+    ("IQM IOP", "Interquartile Mean", 'iqm_iop',
+     r"IOP_{IQM} = \frac{2}{n} \sum_{i=\lfloor n/4 \rfloor}^{\lceil 3n/4 \rceil} IOP_{(i)}"),
+    ("Winsorized IOP", "Trimmed Extremes", 'winsorized_iop',
+     r"IOP_{wins} = \frac{1}{n}\left(IOP_{(2)} + \sum_{i=2}^{n-1} IOP_{(i)} + IOP_{(n-1)}\right)"),
+    ("Weighted IOP", "Consistency-Based", 'weighted_iop',
+     r"IOP_{weighted} = \frac{\sum_{i=1}^{n} w_i \cdot IOP_i}{\sum_{i=1}^{n} w_i}, \quad w_i = \frac{1}{1 + |IOP_i - \text{Median}|}"),
+    ("Possible IOP", "Median", 'possible_iop',
+     r"IOP_{possible} = \text{median}(IOP_1, IOP_2, \ldots, IOP_n)"),
+    ("Clinical IOP", "Range Midpoint", 'clinical_iop',
+     r"IOP_{clinical} = \frac{IOP_{min} + IOP_{max}}{2}"),
+    ("Mean IOP", "Arithmetic Average", 'mean_iop',
+     r"IOP_{mean} = \frac{1}{n}\sum_{i=1}^{n} IOP_i"),
+)
+
+# All formulas in one markdown block, rendered together on demand
+_SECONDARY_FORMULAS_MARKDOWN = "\n\n".join(
+    f"**{label}:**\n\n$$\n{formula}\n$$"
+    for label, _, _, formula in _SECONDARY_ESTIMATES
+)
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _validate_measurements(iop_input: str) -> np.ndarray:
+    """
+    Parse and validate the raw input string.
+    
+    Cached on the input text so reruns with unchanged input skip
+    parsing. Validation errors are raised and not cached.
+    
+    Args:
+        iop_input: Raw comma-separated input string
+        
+    Returns:
+        Validated array of measurements
+    """
+    return validate_measurements(iop_input)
+
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def _compute_results(measurements: np.ndarray) -> dict:
+    """
+    Compute all estimates and their clinical interpretation.
+    
+    Cached on the measurement array (hashed by content) so Streamlit
+    reruns with the same input skip the calculation entirely.
+    
+    Args:
+        measurements: Validated float64 array of IOP values in mmHg
+        
+    Returns:
+        Dictionary of calculated values plus 'interpretation' and
+        'confidence' entries
+    """
+    results = IOPCalculator(measurements).calculate_all()
+    # Interpret the value as displayed (1 decimal) so label and value agree
+    results['interpretation'] = interpret_iop(round(results['safe_iop'], 1))
+    results['confidence'] = get_confidence_note(results['variability'])
+    return results
+
+
 def setup_page():
     """Configure Streamlit page settings with dark theme."""
     st.set_page_config(**STREAMLIT_CONFIG)
     
     # Custom CSS for dark medical theme
-    st.markdown("""
-        <style>
-        .main {
-            background-color: #0e1117;
-        }
-        .stAlert {
-            background-color: #262730;
-        }
-        h1, h2, h3 {
-            color: #fafafa;
-            font-family: 'Segoe UI', sans-serif;
-        }
-        .medical-card {
-            background-color: #262730;
-            padding: 20px;
-            border-radius: 5px;
-            border-left: 4px solid #1f77b4;
-            margin: 10px 0;
-        }
-        .primary-result {
-            background-color: #1a4d2e;
-            padding: 15px;
-            border-radius: 5px;
-            border: 2px solid #4ade80;
-        }
-        </style>
-    """, unsafe_allow_html=True)
+    st.markdown(_CSS, unsafe_allow_html=True)
 
 
 def display_header():
     """Display minimal application header."""
-    st.markdown("<h1 style='text-align: center;'>Real IOP Estimator</h1>", unsafe_allow_html=True)
-    st.markdown("<p style='text-align: center; color: #888;'>Robust intraocular pressure estimation from multiple measurements</p>", unsafe_allow_html=True)
-    st.markdown("<br>", unsafe_allow_html=True)
+    st.markdown(_HEADER_HTML, unsafe_allow_html=True)
 
 
 def display_abstract():
@@ -71,23 +166,7 @@ def display_abstract():
 
 def display_disclaimer():
     """Display medical and legal disclaimer."""
-    st.sidebar.markdown("---")
-    st.sidebar.markdown("### ⚠️ Disclaimer")
-    st.sidebar.caption("""
-    **NOT a medical device. NOT for diagnosis.**
-    
-    Does NOT replace clinical judgment. Author assumes NO LIABILITY.
-    
-    Consult a qualified ophthalmologist for medical advice.
-    """)
-    
-    st.sidebar.markdown("---")
-    st.sidebar.markdown("### ℹ️ About")
-    st.sidebar.caption("""
-    This tool uses robust statistical methods to estimate real IOP from multiple iCare tonometer measurements.
-    
-    **Safe IOP** (trimmed mean) is the primary and most reliable estimate.
-    """)
+    st.sidebar.markdown(_DISCLAIMER_HTML, unsafe_allow_html=True)
 
 
 def display_input_interface():
@@ -133,7 +212,7 @@ def display_primary_result(safe_iop: float, interpretation: str, confidence: str
     with col1:
         st.metric(
             label="Safe IOP",
-            value=f"{safe_iop} mmHg",
+            value=f"{safe_iop:.1f} mmHg",
             help="Most reliable estimate - removes outliers"
         )
     
@@ -171,75 +250,13 @@ def display_secondary_estimates(results: dict):
     st.markdown("### Additional Estimates")
     
     # Create expandable sections for each method
-    with st.expander("Trimean IOP (Tukey's Method) - " + str(results['trimean_iop']) + " mmHg", expanded=False):
-        col1, col2 = st.columns([1, 2])
-        with col1:
-            st.metric(
-                label="Trimean IOP",
-                value=f"{results['trimean_iop']} mmHg"
-            )
-        with col2:
-            st.latex(r"IOP_{trimean} = \frac{Q_1 + 2 \cdot \text{Median} + Q_3}{4}")
+    for label, method, key, _ in _SECONDARY_ESTIMATES:
+        with st.expander(f"{label} ({method}) - {results[key]:.1f} mmHg", expanded=False):
+            st.metric(label=label, value=f"{results[key]:.1f} mmHg")
     
-    with st.expander("IQM IOP (Interquartile Mean) - " + str(results['iqm_iop']) + " mmHg", expanded=False):
-        col1, col2 = st.columns([1, 2])
-        with col1:
-            st.metric(
-                label="IQM IOP",
-                value=f"{results['iqm_iop']} mmHg"
-            )
-        with col2:
-            st.latex(r"IOP_{IQM} = \frac{2}{n} \sum_{i=\lfloor n/4 \rfloor}^{\lceil 3n/4 \rceil} IOP_{(i)}")
-    
-    with st.expander("Winsorized IOP (Trimmed Extremes) - " + str(results['winsorized_iop']) + " mmHg", expanded=False):
-        col1, col2 = st.columns([1, 2])
-        with col1:
-            st.metric(
-                label="Winsorized IOP",
-                value=f"{results['winsorized_iop']} mmHg"
-            )
-        with col2:
-            st.latex(r"IOP_{wins} = \frac{1}{n}\left(IOP_{(2)} + \sum_{i=2}^{n-1} IOP_{(i)} + IOP_{(n-1)}\right)")
-    
-    with st.expander("Weighted IOP (Consistency-Based) - " + str(results['weighted_iop']) + " mmHg", expanded=False):
-        col1, col2 = st.columns([1, 2])
-        with col1:
-            st.metric(
-                label="Weighted IOP",
-                value=f"{results['weighted_iop']} mmHg"
-            )
-        with col2:
-            st.latex(r"IOP_{weighted} = \frac{\sum_{i=1}^{n} w_i \cdot IOP_i}{\sum_{i=1}^{n} w_i}, \quad w_i = \frac{1}{1 + |IOP_i - \text{Median}|}")
-    
-    with st.expander("Possible IOP (Median) - " + str(results['possible_iop']) + " mmHg", expanded=False):
-        col1, col2 = st.columns([1, 2])
-        with col1:
-            st.metric(
-                label="Possible IOP",
-                value=f"{results['possible_iop']} mmHg"
-            )
-        with col2:
-            st.latex(r"IOP_{possible} = \text{median}(IOP_1, IOP_2, \ldots, IOP_n)")
-    
-    with st.expander("Clinical IOP (Range Midpoint) - " + str(results['clinical_iop']) + " mmHg", expanded=False):
-        col1, col2 = st.columns([1, 2])
-        with col1:
-            st.metric(
-                label="Clinical IOP",
-                value=f"{results['clinical_iop']} mmHg"
-            )
-        with col2:
-            st.latex(r"IOP_{clinical} = \frac{IOP_{min} + IOP_{max}}{2}")
-    
-    with st.expander("Mean IOP (Arithmetic Average) - " + str(results['mean_iop']) + " mmHg", expanded=False):
-        col1, col2 = st.columns([1, 2])
-        with col1:
-            st.metric(
-                label="Mean IOP",
-                value=f"{results['mean_iop']} mmHg"
-            )
-        with col2:
-            st.latex(r"IOP_{mean} = \frac{1}{n}\sum_{i=1}^{n} IOP_i")
+    # All formulas in a single markdown block instead of one st.latex each
+    with st.expander("Show formulas", expanded=False):
+        st.markdown(_SECONDARY_FORMULAS_MARKDOWN)
     
     # Summary metrics row
     st.markdown("**Measurement Variability:**")
@@ -328,11 +345,7 @@ def display_clinical_notes():
 
 def display_welcome_screen():
     """Display welcome message."""
-    st.markdown("""
-    <div style='text-align: center; padding: 40px 20px;'>
-        <p style='font-size: 16px; color: #888;'>Enter your measurements above and click the button to calculate</p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(_WELCOME_HTML, unsafe_allow_html=True)
 
 
 def main():
@@ -351,20 +364,20 @@ def main():
             return
         
         try:
-            # Validate and parse input
-            measurements = validate_measurements(iop_input)
+            # Validate and parse input (cached across reruns)
+            measurements = _validate_measurements(iop_input)
             
-            # Perform calculations
-            calculator = IOPCalculator(measurements)
-            results = calculator.calculate_all()
+            # Perform calculations (cached across reruns)
+            results = _compute_results(measurements)
             
             # Display results
             st.header("Results")
             
-            interpretation = calculator.interpret_iop(results['safe_iop'])
-            confidence = calculator.get_confidence_note()
-            
-            display_primary_result(results['safe_iop'], interpretation, confidence)
+            display_primary_result(
+                results['safe_iop'],
+                results['interpretation'],
+                results['confidence']
+            )
             display_secondary_estimates(results)
             display_statistics(results)
             
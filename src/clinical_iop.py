@@ -8,9 +8,13 @@ Author: edujbarrios
 """
 
 import numpy as np
+from typing import Optional
 
+from statistics import IOPStats
 
-def calculate_clinical_iop(measurements: np.ndarray) -> float:
+
+def calculate_clinical_iop(measurements: np.ndarray,
+                           stats: Optional[IOPStats] = None) -> float:
     """
     Calculate Clinical IOP as functional range midpoint.
     
@@ -22,8 +26,12 @@ def calculate_clinical_iop(measurements: np.ndarray) -> float:
     
     Args:
         measurements: Array of IOP measurements
+        stats: Precomputed statistics (built from measurements if omitted)
         
     Returns:
         Clinical IOP value in mmHg
     """
-    return round((np.min(measurements) + np.max(measurements)) / 2, 1)
+    if stats is None:
+        stats = IOPStats.from_measurements(measurements)
+    
+    return (stats.minimum + stats.maximum) / 2
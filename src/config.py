@@ -8,6 +8,8 @@ clinical constants, and display parameters.
 Author: edujbarrios
 """
 
+import os
+
 # Streamlit theme configuration (dark mode)
 STREAMLIT_CONFIG = {
     "page_title": "IOP Estimator - iCare Tonometer",
@@ -63,6 +65,23 @@ MIN_MEASUREMENTS = 3
 MIN_IOP_VALUE = 0
 MAX_IOP_VALUE = 100
 
+# Measurements per row from which batch mode partially sorts (np.partition)
+# instead of fully sorting; below this a full sort is faster
+PARTITION_MIN_MEASUREMENTS = 64
+
+# Patients per batch from which the Numba batch kernel runs rows in
+# parallel; below this thread dispatch costs more than it saves
+PARALLEL_MIN_PATIENTS = 1024
+
+# Largest measurement count sorted with a compiled sorting network instead
+# of np.sort (covers the typical 3-10 clinical readings)
+SORT_NETWORK_MAX_MEASUREMENTS = 10
+
+# App-local directory for Numba's on-disk kernel cache, so compiled kernels
+# survive Streamlit restarts; an existing NUMBA_CACHE_DIR takes precedence
+NUMBA_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               '.numba_cache')
+
 # Plot styling
 PLOT_STYLE = {
     'figure_size': (12, 4),
@@ -74,6 +93,9 @@ PLOT_STYLE = {
     'grid_alpha': 0.3
 }
 
+# Released figure skeletons kept for reuse by create_visualization
+FIGURE_POOL_SIZE = 4
+
 # Clinical zones for visualization
 CLINICAL_ZONES = {
     'hypotony': {'range': (0, 10), 'color': '#ff4444', 'alpha': 0.1},
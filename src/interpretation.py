@@ -7,9 +7,30 @@ Provides clinical interpretation of IOP values and measurement quality.
 Author: edujbarrios
 """
 
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+
 from config import CLINICAL_RANGES, INTERPRETATION_LABELS, VARIABILITY_THRESHOLDS
 
 
+# Sorted upper range limits and their labels for bisect lookups
+_IOP_BOUNDARIES = [max_val for min_val, max_val in list(CLINICAL_RANGES.values())[:-1]]
+_IOP_LABELS = [INTERPRETATION_LABELS[category] for category in CLINICAL_RANGES]
+
+_VARIABILITY_BOUNDARIES = [
+    VARIABILITY_THRESHOLDS['excellent'],
+    VARIABILITY_THRESHOLDS['good'],
+    VARIABILITY_THRESHOLDS['fair']
+]
+_CONFIDENCE_NOTES = [
+    "Excellent measurement consistency - High confidence",
+    "Good measurement consistency - Moderate confidence",
+    "Fair measurement consistency - Consider additional measurements",
+    "High variability detected - Additional measurements recommended"
+]
+
+
+@lru_cache(maxsize=1024)
 def interpret_iop(iop_value: float) -> str:
     """
     Provide clinical interpretation of IOP value.
@@ -20,11 +41,7 @@ def interpret_iop(iop_value: float) -> str:
     Returns:
         Clinical interpretation string
     """
-    for category, (min_val, max_val) in CLINICAL_RANGES.items():
-        if min_val <= iop_value < max_val:
-            return INTERPRETATION_LABELS[category]
-    
-    return INTERPRETATION_LABELS['severely_elevated']
+    return _IOP_LABELS[bisect_right(_IOP_BOUNDARIES, iop_value)]
 
 
 def get_confidence_note(variability: float) -> str:
@@ -37,16 +54,10 @@ def get_confidence_note(variability: float) -> str:
     Returns:
         Confidence assessment string
     """
-    if variability <= VARIABILITY_THRESHOLDS['excellent']:
-        return "Excellent measurement consistency - High confidence"
-    elif variability <= VARIABILITY_THRESHOLDS['good']:
-        return "Good measurement consistency - Moderate confidence"
-    elif variability <= VARIABILITY_THRESHOLDS['fair']:
-        return "Fair measurement consistency - Consider additional measurements"
-    else:
-        return "High variability detected - Additional measurements recommended"
+    return _CONFIDENCE_NOTES[bisect_left(_VARIABILITY_BOUNDARIES, variability)]
 
 
+@lru_cache(maxsize=16)
 def get_status_color(interpretation: str) -> str:
     """
     Get color designation for clinical status.
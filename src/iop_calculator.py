@@ -14,7 +14,8 @@ License: Open Source
 """
 
 import numpy as np
-from typing import List, Dict, Tuple
+from functools import cached_property
+from typing import List, Dict, Tuple, Union
 
 from safe_iop import calculate_safe_iop
 from possible_iop import calculate_possible_iop
@@ -24,8 +25,29 @@ from trimean_iop import calculate_trimean_iop
 from iqm_iop import calculate_iqm_iop
 from winsorized_iop import calculate_winsorized_iop
 from weighted_iop import calculate_weighted_iop
-from statistics import get_range, get_variability, get_standard_deviation
+from statistics import IOPStats, get_range, get_variability, get_standard_deviation
 from interpretation import interpret_iop, get_confidence_note
+from kernels import compute_all, compute_batch, index_plan, sort_measurements
+from _util import round1, round2
+from config import PARTITION_MIN_MEASUREMENTS
+
+
+# Result key and conversion for each value returned by compute_all, in order.
+# Estimates stay at full precision; rounding happens at the display layer.
+_RESULT_FIELDS = (
+    ('safe_iop', float),
+    ('possible_iop', float),
+    ('clinical_iop', float),
+    ('mean_iop', float),
+    ('trimean_iop', float),
+    ('iqm_iop', float),
+    ('winsorized_iop', float),
+    ('weighted_iop', float),
+    ('min_iop', round1),
+    ('max_iop', round1),
+    ('variability', round1),
+    ('std_dev', round2),
+)
 
 
 class IOPCalculator:
@@ -42,92 +64,205 @@ class IOPCalculator:
     Therefore, robust mathematical methods are essential for reliable IOP estimation.
     """
     
-    def __init__(self, measurements: List[float]):
+    def __init__(self, measurements: Union[List[float], np.ndarray]):
         """
         Initialize the calculator with IOP measurements.
         
         Args:
-            measurements: List of IOP values in mmHg
+            measurements: List or array of IOP values in mmHg
             
         Raises:
-            ValueError: If fewer than 3 measurements are provided
+            ValueError: If fewer than 3 measurements are provided or any
+                measurement is NaN or infinite
         """
         if len(measurements) < 3:
             raise ValueError("At least 3 measurements are required for robust estimation")
         
-        self.measurements = np.array(sorted(measurements))
+        values = np.asarray(measurements, dtype=np.float64)
+        if not np.isfinite(values).all():
+            raise ValueError("Measurements must be finite numbers (no NaN or infinity)")
+        
+        self.measurements = sort_measurements(values)
         self.n = len(self.measurements)
     
+    @cached_property
+    def _stats(self) -> IOPStats:
+        """
+        Derived quantities shared by the individual estimators.
+        
+        Built on first use only: calculate_all reads everything from the
+        fused kernel and never needs them.
+        """
+        return IOPStats.from_sorted(self.measurements)
+    
     def calculate_safe_iop(self) -> float:
         """Calculate Safe IOP using trimmed mean method."""
-        return calculate_safe_iop(self.measurements)
+        return calculate_safe_iop(self.measurements, self._stats)
     
     def calculate_possible_iop(self) -> float:
         """Calculate Possible IOP using median."""
-        return calculate_possible_iop(self.measurements)
+        return calculate_possible_iop(self.measurements, self._stats)
     
     def calculate_clinical_iop(self) -> float:
         """Calculate Clinical IOP as functional range midpoint."""
-        return calculate_clinical_iop(self.measurements)
+        return calculate_clinical_iop(self.measurements, self._stats)
     
     def calculate_mean_iop(self) -> float:
         """Calculate simple arithmetic mean IOP."""
-        return calculate_mean_iop(self.measurements)
+        return calculate_mean_iop(self.measurements, self._stats)
     
     def calculate_trimean_iop(self) -> float:
         """Calculate Trimean IOP using Tukey's method."""
-        return calculate_trimean_iop(self.measurements)
+        return calculate_trimean_iop(self.measurements, self._stats)
     
     def calculate_iqm_iop(self) -> float:
         """Calculate Interquartile Mean IOP."""
-        return calculate_iqm_iop(self.measurements)
+        return calculate_iqm_iop(self.measurements, self._stats)
     
     def calculate_winsorized_iop(self) -> float:
         """Calculate Winsorized Mean IOP."""
-        return calculate_winsorized_iop(self.measurements)
+        return calculate_winsorized_iop(self.measurements, self._stats)
     
     def calculate_weighted_iop(self) -> float:
         """Calculate Weighted Mean IOP by consistency."""
-        return calculate_weighted_iop(self.measurements)
+        return calculate_weighted_iop(self.measurements, self._stats)
     
     def get_range(self) -> Tuple[float, float]:
         """Get minimum and maximum values."""
-        return get_range(self.measurements)
+        return get_range(self.measurements, self._stats)
     
     def get_variability(self) -> float:
         """Calculate range of measurements (max - min)."""
-        return get_variability(self.measurements)
+        return get_variability(self.measurements, self._stats)
     
     def get_standard_deviation(self) -> float:
         """Calculate standard deviation of measurements."""
-        return get_standard_deviation(self.measurements)
+        return get_standard_deviation(self.measurements, self._stats)
     
     def calculate_all(self) -> Dict[str, float]:
         """
         Calculate all IOP estimates and statistics.
         
+        All estimators are computed by a single fused kernel over the
+        already sorted measurements (JIT-compiled when Numba is
+        installed). Results agree with the individual calculation
+        modules up to floating-point rounding.
+        
         Returns:
-            Dictionary containing all calculated values
+            Dictionary containing all calculated values; IOP estimates
+            are unrounded, summary statistics are rounded
         """
-        min_val, max_val = self.get_range()
+        results = {
+            name: convert(value)
+            for (name, convert), value
+            in zip(_RESULT_FIELDS, compute_all(self.measurements))
+        }
+        results['n_measurements'] = self.n
+        
+        return results
+    
+    @staticmethod
+    def calculate_batch(matrix: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Calculate all IOP estimates for many patients at once.
+        
+        Each row holds the measurements of one patient (or visit). Rows
+        with fewer measurements (e.g. from a clinic export) are padded
+        with NaN; they are grouped by measurement count and each group is
+        batched separately. Rows are sorted
+        once (partially, via np.partition, for large rows) and all
+        estimators are computed by the batch kernel: Numba-compiled and
+        parallel across patients for large batches when Numba is
+        installed, vectorized NumPy otherwise.
+        
+        Args:
+            matrix: Array of shape (n_patients, n_measurements) in mmHg
+            
+        Returns:
+            Dictionary with the same keys and rounding as calculate_all,
+            each mapping to an array with one value per patient
+            
+        Raises:
+            ValueError: If the input is not 2-D, has fewer than 3
+                measurements per patient or contains infinite values
+        """
+        data = np.asarray(matrix, dtype=np.float64)
+        if data.ndim != 2:
+            raise ValueError("Batch input must have shape (patients, measurements)")
+        
+        missing = np.isnan(data)
+        if missing.any():
+            return IOPCalculator._calculate_padded_batch(data, missing)
+        
+        # NaN (padding) is handled above; any remaining infinity is invalid
+        if not np.isfinite(data).all():
+            raise ValueError("Measurements must be finite numbers (no NaN or infinity)")
+        
+        n_patients, n = data.shape
+        if n < 3:
+            raise ValueError("At least 3 measurements are required for robust estimation")
+        
+        plan = index_plan(n)
+        (mid_lo, mid_hi, q1_lo, q1_hi, q1_frac,
+         q3_lo, q3_hi, q3_frac, iqr_lo, iqr_hi) = plan
+        
+        if n >= PARTITION_MIN_MEASUREMENTS:
+            # Only the order statistics read by the kernel need to be in place
+            kth = sorted({0, 1, mid_lo, mid_hi, q1_lo, q1_hi, q3_lo, q3_hi,
+                          iqr_lo, iqr_hi - 1, n - 2, n - 1})
+            data = np.partition(data, kth, axis=1)
+        else:
+            data = np.sort(data, axis=1)
+        
+        (safe, possible, clinical, mean, trimean, iqm, winsorized, weighted,
+         min_val, max_val, variability, std_dev) = compute_batch(data, plan)
         
         return {
-            'safe_iop': self.calculate_safe_iop(),
-            'possible_iop': self.calculate_possible_iop(),
-            'clinical_iop': self.calculate_clinical_iop(),
-            'mean_iop': self.calculate_mean_iop(),
-            'trimean_iop': self.calculate_trimean_iop(),
-            'trimean_iop': self.calculate_trimean_iop(),
-            'iqm_iop': self.calculate_iqm_iop(),
-            'winsorized_iop': self.calculate_winsorized_iop(),
-            'weighted_iop': self.calculate_weighted_iop(),
-            'min_iop': min_val,
-            'max_iop': max_val,
-            'variability': self.get_variability(),
-            'std_dev': self.get_standard_deviation(),
-            'n_measurements': self.n
+            'safe_iop': safe,
+            'possible_iop': possible,
+            'clinical_iop': clinical,
+            'mean_iop': mean,
+            'trimean_iop': trimean,
+            'iqm_iop': iqm,
+            'winsorized_iop': winsorized,
+            'weighted_iop': weighted,
+            'min_iop': np.round(min_val, 1),
+            'max_iop': np.round(max_val, 1),
+            'variability': np.round(variability, 1),
+            'std_dev': np.round(std_dev, 2),
+            'n_measurements': np.full(n_patients, n)
         }
     
+    @staticmethod
+    def _calculate_padded_batch(data: np.ndarray,
+                                missing: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Calculate a NaN-padded batch by grouping rows of equal length.
+        
+        Args:
+            data: Array of shape (n_patients, max_measurements), NaN-padded
+            missing: NaN mask of data
+            
+        Returns:
+            Dictionary in the format of calculate_batch
+        """
+        counts = data.shape[1] - missing.sum(axis=1)
+        if counts.min() < 3:
+            raise ValueError("At least 3 measurements are required for robust estimation")
+        
+        # NaN sorts last, so each row's measurements lead its sorted row
+        data = np.sort(data, axis=1)
+        
+        results = {}
+        for n in np.unique(counts):
+            rows = np.flatnonzero(counts == n)
+            group = IOPCalculator.calculate_batch(data[rows, :n])
+            for key, values in group.items():
+                if key not in results:
+                    results[key] = np.empty(len(data), dtype=values.dtype)
+                results[key][rows] = values
+        return results
+    
     def interpret_iop(self, iop_value: float) -> str:
         """Provide clinical interpretation of IOP value."""
         return interpret_iop(iop_value)
@@ -9,9 +9,13 @@ Author: edujbarrios
 """
 
 import numpy as np
+from typing import Optional
 
+from statistics import IOPStats
 
-def calculate_iqm_iop(measurements: np.ndarray) -> float:
+
+def calculate_iqm_iop(measurements: np.ndarray,
+                      stats: Optional[IOPStats] = None) -> float:
     """
     Calculate Interquartile Mean (IQM) IOP.
     
@@ -24,6 +28,7 @@ def calculate_iqm_iop(measurements: np.ndarray) -> float:
     
     Args:
         measurements: Array of IOP measurements
+        stats: Precomputed statistics (built from measurements if omitted)
         
     Returns:
         IQM IOP value in mmHg
@@ -34,19 +39,21 @@ def calculate_iqm_iop(measurements: np.ndarray) -> float:
         - Reduces impact of measurement angle errors
         - Superior for irregular corneal surfaces
     """
-    sorted_data = np.sort(measurements)
-    n = len(sorted_data)
+    if stats is None:
+        stats = IOPStats.from_measurements(measurements)
+    
+    n = stats.n
     
     # Calculate quartile boundaries
-    lower_idx = int(np.floor(n / 4))
-    upper_idx = int(np.ceil(3 * n / 4))
+    lower_idx = n // 4
+    upper_idx = (3 * n + 3) // 4
     
     # Extract interquartile range
-    iqr_data = sorted_data[lower_idx:upper_idx]
+    iqr_data = stats.sorted_values[lower_idx:upper_idx].tolist()
     
     if len(iqr_data) == 0:
-        return round(np.mean(measurements), 1)
+        return stats.total / n
     
-    iqm = np.mean(iqr_data)
+    iqm = sum(iqr_data) / len(iqr_data)
     
-    return round(iqm, 1)
+    return iqm
@@ -0,0 +1,450 @@
+"""
+Statistics Kernel Module
+========================
+
+Fused computation of all IOP estimators over a sorted measurement array,
+for a single patient or a batch of patients. Compiled with Numba when it
+is installed; otherwise single-patient kernels run as plain Python on a
+list of floats and batches use vectorized NumPy.
+
+Author: edujbarrios
+"""
+
+import math
+import os
+import numpy as np
+
+from config import (NUMBA_CACHE_DIR, PARALLEL_MIN_PATIENTS,
+                    SORT_NETWORK_MAX_MEASUREMENTS)
+
+# Must be set before Numba is imported to take effect
+os.environ.setdefault('NUMBA_CACHE_DIR', NUMBA_CACHE_DIR)
+
+try:
+    from numba import njit, prange
+except ImportError:  # Numba is optional
+    njit = None
+    prange = range
+
+
+# Explicit kernel signatures: Numba compiles (or loads from its disk cache)
+# at import time instead of on the first call
+_PLAN_TYPE = ('Tuple((int64, int64, int64, int64, float64, '
+              'int64, int64, float64, int64, int64))')
+_COMPUTE_ALL_SIGNATURE = f'UniTuple(float64, 12)(float64[::1], {_PLAN_TYPE})'
+_BATCH_SIGNATURE = f'void(float64[:, ::1], {_PLAN_TYPE}, float64[:, ::1])'
+_WEIGHTED_SIGNATURE = 'float64(float64[::1], float64)'
+_RANGE_SIGNATURE = 'int64(float64[::1], float64, float64)'
+_NETWORK_SIGNATURE = 'void(float64[::1], int64[:, ::1])'
+
+
+def _jit(signature, **options):
+    """
+    Decorator compiling a kernel eagerly with Numba if available.
+
+    Without Numba the function is returned unchanged.
+    """
+    def decorate(func):
+        if njit is None:
+            return func
+        settings = {'cache': True, 'fastmath': True, **options}
+        return njit(signature, **settings)(func)
+    return decorate
+
+
+def index_plan(n):
+    """
+    Precompute the sorted-array indices each estimator reads for size n.
+
+    Quartiles use linear interpolation between neighbours, matching the
+    default method of np.percentile.
+
+    Returns:
+        Tuple of (mid_lo, mid_hi, q1_lo, q1_hi, q1_frac, q3_lo, q3_hi,
+        q3_frac, iqr_lo, iqr_hi)
+    """
+    def quartile(q):
+        position = (n - 1) * q
+        lower = int(position)
+        return lower, min(lower + 1, n - 1), position - lower
+
+    q1_lo, q1_hi, q1_frac = quartile(0.25)
+    q3_lo, q3_hi, q3_frac = quartile(0.75)
+    return (
+        (n - 1) // 2, n // 2,
+        q1_lo, q1_hi, q1_frac,
+        q3_lo, q3_hi, q3_frac,
+        n // 4, (3 * n + 3) // 4,
+    )
+
+
+# Index plans for common clinical sample sizes, built once at import
+_INDEX_PLANS = {n: index_plan(n) for n in range(3, 33)}
+
+
+def sorting_network(n):
+    """
+    Build the Bose-Nelson sorting network for n elements.
+
+    Returns:
+        Int64 array of shape (n_comparators, 2) with index pairs (i, j),
+        i < j, to compare-and-swap in order
+    """
+    pairs = []
+
+    def merge(i, x, j, y):
+        # Merge sorted runs [i, i + x) and [j, j + y)
+        if x == 1 and y == 1:
+            pairs.append((i, j))
+        elif x == 1 and y == 2:
+            pairs.extend(((i, j + 1), (i, j)))
+        elif x == 2 and y == 1:
+            pairs.extend(((i, j), (i + 1, j)))
+        else:
+            a = x // 2
+            b = y // 2 if x % 2 else (y + 1) // 2
+            merge(i, a, j, b)
+            merge(i + a, x - a, j + b, y - b)
+            merge(i + a, x - a, j, b)
+
+    def sort(i, m):
+        if m > 1:
+            a = m // 2
+            sort(i, a)
+            sort(i + a, m - a)
+            merge(i, a, i + a, m - a)
+
+    sort(0, n)
+    return np.array(pairs, dtype=np.int64).reshape(-1, 2)
+
+
+# Sorting networks for the small sample sizes typical in the clinic
+_SORTING_NETWORKS = {
+    n: sorting_network(n) for n in range(2, SORT_NETWORK_MAX_MEASUREMENTS + 1)
+}
+
+
+@_jit(_COMPUTE_ALL_SIGNATURE)
+def _compute_all(values, plan):
+    """
+    Compute all estimators and statistics in a single kernel.
+
+    Args:
+        values: IOP measurements sorted in ascending order (n >= 3)
+        plan: Index plan for len(values), from index_plan
+
+    Returns:
+        Tuple of unrounded (safe, possible, clinical, mean, trimean, iqm,
+        winsorized, weighted, min, max, variability, std_dev) values
+    """
+    (mid_lo, mid_hi, q1_lo, q1_hi, q1_frac,
+     q3_lo, q3_hi, q3_frac, iqr_lo, iqr_hi) = plan
+    n = len(values)
+    min_val = values[0]
+    max_val = values[n - 1]
+
+    total = 0.0
+    for i in range(n):
+        total += values[i]
+    mean = total / n
+
+    # Order statistics at precomputed indices
+    median = (values[mid_lo] + values[mid_hi]) / 2
+    q1 = values[q1_lo] + (values[q1_hi] - values[q1_lo]) * q1_frac
+    q3 = values[q3_lo] + (values[q3_hi] - values[q3_lo]) * q3_frac
+
+    # Interquartile mean over sorted indices [floor(n/4), ceil(3n/4))
+    iqr_sum = 0.0
+    for i in range(iqr_lo, iqr_hi):
+        iqr_sum += values[i]
+
+    # Weighted mean and squared deviations
+    weight_sum = 0.0
+    weighted_sum = 0.0
+    squared_dev = 0.0
+    for i in range(n):
+        value = values[i]
+        weight = 1.0 / (1.0 + abs(value - median))
+        weight_sum += weight
+        weighted_sum += weight * value
+        squared_dev += (value - mean) ** 2
+
+    return (
+        (total - min_val - max_val) / (n - 2),
+        median,
+        (min_val + max_val) / 2,
+        mean,
+        (q1 + 2 * median + q3) / 4,
+        iqr_sum / (iqr_hi - iqr_lo),
+        (total - min_val - max_val + values[1] + values[n - 2]) / n,
+        weighted_sum / weight_sum,
+        min_val,
+        max_val,
+        max_val - min_val,
+        math.sqrt(squared_dev / (n - 1)),
+    )
+
+
+# fastmath is off: it assumes no NaNs, and the comparator must order them
+@_jit(_NETWORK_SIGNATURE, fastmath=False)
+def _apply_network(values, network):
+    """
+    Sort in place with compare-and-swap over the network.
+
+    NaN compares as larger than any number, so NaNs are carried through
+    and end up last, exactly as with np.sort (plain min/max would drop
+    them and duplicate a neighbour instead).
+    """
+    for k in range(network.shape[0]):
+        i = network[k, 0]
+        j = network[k, 1]
+        a = values[i]
+        b = values[j]
+        if b < a or a != a:
+            values[i] = b
+            values[j] = a
+
+
+def sort_measurements(measurements):
+    """
+    Return a sorted float64 copy of the measurements.
+
+    Small inputs are sorted by a compiled sorting network, which avoids
+    np.sort's dispatch and partitioning overhead; larger inputs (or
+    running without Numba) use np.sort. NaNs are kept and sorted last,
+    as with np.sort.
+
+    Args:
+        measurements: Float64 array of IOP measurements
+
+    Returns:
+        Contiguous float64 array sorted in ascending order
+    """
+    network = _SORTING_NETWORKS.get(len(measurements))
+    if njit is None or network is None:
+        return np.sort(measurements)
+    values = measurements.copy()  # C-contiguous
+    _apply_network(values, network)
+    return values
+
+
+def compute_all(measurements):
+    """
+    Compute all IOP estimators from a sorted measurement array.
+
+    Args:
+        measurements: Contiguous float64 array sorted in ascending order
+
+    Returns:
+        Tuple of unrounded (safe, possible, clinical, mean, trimean, iqm,
+        winsorized, weighted, min, max, variability, std_dev) values
+    """
+    n = len(measurements)
+    plan = _INDEX_PLANS.get(n)
+    if plan is None:
+        plan = index_plan(n)
+
+    if njit is None:
+        # Plain Python is much faster on a list than on NumPy scalars
+        return _compute_all(measurements.tolist(), plan)
+    return _compute_all(measurements, plan)
+
+
+# Block size of NumPy's pairwise summation (PW_BLOCKSIZE)
+_PAIRWISE_BLOCK = 128
+
+
+# fastmath is off so LLVM cannot reassociate the summation order below
+@_jit(_WEIGHTED_SIGNATURE, fastmath=False)
+def _weighted_sum(values, median):
+    """
+    Fused single-pass weighted mean with w_i = 1 / (1 + |x_i - median|).
+
+    Both sums use the blocked summation of np.sum (eight interleaved
+    accumulators per block, combined pairwise), so results match
+    np.sum bit for bit up to one block and keep its low error growth
+    beyond that.
+    """
+    n = values.size
+    total = 0.0
+    weight_sum = 0.0
+    lanes_total = np.empty(8)
+    lanes_weight = np.empty(8)
+    for start in range(0, n, _PAIRWISE_BLOCK):
+        stop = min(start + _PAIRWISE_BLOCK, n)
+        if stop - start < 8:
+            block_total = 0.0
+            block_weight = 0.0
+            for i in range(start, stop):
+                weight = 1.0 / (1.0 + abs(values[i] - median))
+                block_total += weight * values[i]
+                block_weight += weight
+        else:
+            for j in range(8):
+                weight = 1.0 / (1.0 + abs(values[start + j] - median))
+                lanes_total[j] = weight * values[start + j]
+                lanes_weight[j] = weight
+            unrolled_stop = stop - (stop - start) % 8
+            for i in range(start + 8, unrolled_stop, 8):
+                for j in range(8):
+                    weight = 1.0 / (1.0 + abs(values[i + j] - median))
+                    lanes_total[j] += weight * values[i + j]
+                    lanes_weight[j] += weight
+            block_total = (((lanes_total[0] + lanes_total[1])
+                            + (lanes_total[2] + lanes_total[3]))
+                           + ((lanes_total[4] + lanes_total[5])
+                              + (lanes_total[6] + lanes_total[7])))
+            block_weight = (((lanes_weight[0] + lanes_weight[1])
+                             + (lanes_weight[2] + lanes_weight[3]))
+                            + ((lanes_weight[4] + lanes_weight[5])
+                               + (lanes_weight[6] + lanes_weight[7])))
+            for i in range(unrolled_stop, stop):
+                weight = 1.0 / (1.0 + abs(values[i] - median))
+                block_total += weight * values[i]
+                block_weight += weight
+        total += block_total
+        weight_sum += block_weight
+    return total / weight_sum
+
+
+def weighted_mean(values, median):
+    """
+    Compute the consistency-weighted mean of a measurement array.
+
+    Args:
+        values: Contiguous float64 array of IOP measurements
+        median: Median of values
+
+    Returns:
+        Unrounded weighted mean, Σ(w_i · x_i) / Σ(w_i)
+    """
+    if njit is None:
+        # Vectorized fallback: weights built in place in one buffer, and
+        # the dot product avoids a weights * values temporary
+        weights = np.abs(values - median)
+        weights += 1.0
+        np.reciprocal(weights, out=weights)
+        return np.dot(weights, values) / weights.sum()
+    return _weighted_sum(values, median)
+
+
+# fastmath is off: it assumes no NaNs, and NaN must count as out of range
+@_jit(_RANGE_SIGNATURE, fastmath=False)
+def _first_out_of_range(values, lower, upper):
+    """Single early-exit scan for the first value outside [lower, upper]."""
+    for i in range(values.size):
+        if not (lower <= values[i] <= upper):
+            return i
+    return -1
+
+
+def first_out_of_range(values, lower, upper):
+    """
+    Find the first measurement outside the accepted range.
+
+    Args:
+        values: Array of IOP measurements
+        lower: Smallest accepted value
+        upper: Largest accepted value
+
+    Returns:
+        Index of the first value outside [lower, upper] (NaN included),
+        or -1 if all values are in range
+    """
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    if njit is None:
+        # Fast accept with two reductions; the mask is built only on failure
+        if values.min() >= lower and values.max() <= upper:
+            return -1
+        return int((~((values >= lower) & (values <= upper))).argmax())
+    return _first_out_of_range(values, float(lower), float(upper))
+
+
+def _batch_rows(sorted_matrix, plan, out):
+    """
+    Run the single-patient kernel over every row of a batch.
+
+    Args:
+        sorted_matrix: Array of shape (n_patients, n), each row sorted
+        plan: Index plan for n, from index_plan
+        out: Preallocated (n_patients, 12) output array
+    """
+    for i in prange(sorted_matrix.shape[0]):
+        row = _compute_all(sorted_matrix[i], plan)
+        for j in range(len(row)):
+            out[i, j] = row[j]
+
+
+# Parallel dispatch only pays off once there are enough rows per thread
+_batch_serial = _jit(_BATCH_SIGNATURE)(_batch_rows)
+_batch_parallel = _jit(_BATCH_SIGNATURE, parallel=True)(_batch_rows)
+
+
+def _batch_numpy(data, plan):
+    """
+    Vectorized NumPy fallback for compute_batch.
+
+    Args:
+        data: Array of shape (n_patients, n), each row sorted
+        plan: Index plan for n, from index_plan
+
+    Returns:
+        Tuple of 12 per-patient arrays, in compute_all order
+    """
+    (mid_lo, mid_hi, q1_lo, q1_hi, q1_frac,
+     q3_lo, q3_hi, q3_frac, iqr_lo, iqr_hi) = plan
+    n = data.shape[1]
+
+    min_val = data[:, 0]
+    max_val = data[:, -1]
+    total = data.sum(axis=1)
+
+    median = (data[:, mid_lo] + data[:, mid_hi]) / 2
+    q1 = data[:, q1_lo] + (data[:, q1_hi] - data[:, q1_lo]) * q1_frac
+    q3 = data[:, q3_lo] + (data[:, q3_hi] - data[:, q3_lo]) * q3_frac
+
+    weights = np.abs(data - median[:, np.newaxis])
+    weights += 1.0
+    np.reciprocal(weights, out=weights)
+    weighted = np.einsum('ij,ij->i', weights, data) / weights.sum(axis=1)
+
+    return (
+        (total - min_val - max_val) / (n - 2),
+        median,
+        (min_val + max_val) / 2,
+        total / n,
+        (q1 + 2 * median + q3) / 4,
+        data[:, iqr_lo:iqr_hi].mean(axis=1),
+        (total - min_val - max_val + data[:, 1] + data[:, -2]) / n,
+        weighted,
+        min_val,
+        max_val,
+        max_val - min_val,
+        data.std(axis=1, ddof=1),
+    )
+
+
+def compute_batch(data, plan):
+    """
+    Compute all IOP estimators for every row of a batch.
+
+    Rows only need the order statistics named in the plan in place, so a
+    suitably partitioned array works as well as a fully sorted one.
+
+    Args:
+        data: Float64 array of shape (n_patients, n), each row sorted
+        plan: Index plan for n, from index_plan
+
+    Returns:
+        Tuple of 12 per-patient arrays, in compute_all order
+    """
+    if njit is None:
+        return _batch_numpy(data, plan)
+
+    data = np.ascontiguousarray(data)
+    out = np.empty((data.shape[0], 12))
+    if data.shape[0] >= PARALLEL_MIN_PATIENTS:
+        _batch_parallel(data, plan, out)
+    else:
+        _batch_serial(data, plan, out)
+    return tuple(out.T)
@@ -8,9 +8,13 @@ Author: edujbarrios
 """
 
 import numpy as np
+from typing import Optional
 
+from statistics import IOPStats
 
-def calculate_possible_iop(measurements: np.ndarray) -> float:
+
+def calculate_possible_iop(measurements: np.ndarray,
+                           stats: Optional[IOPStats] = None) -> float:
     """
     Calculate Possible IOP using median.
     
@@ -22,8 +26,12 @@ def calculate_possible_iop(measurements: np.ndarray) -> float:
     
     Args:
         measurements: Array of IOP measurements
+        stats: Precomputed statistics (built from measurements if omitted)
         
     Returns:
         Median IOP value in mmHg
     """
-    return round(np.median(measurements), 1)
+    if stats is None:
+        stats = IOPStats.from_measurements(measurements)
+    
+    return stats.median
@@ -9,9 +9,13 @@ Author: edujbarrios
 """
 
 import numpy as np
+from typing import Optional
 
+from statistics import IOPStats
 
-def calculate_safe_iop(measurements: np.ndarray) -> float:
+
+def calculate_safe_iop(measurements: np.ndarray,
+                       stats: Optional[IOPStats] = None) -> float:
     """
     Calculate Safe IOP using trimmed mean method.
     
@@ -22,7 +26,8 @@ def calculate_safe_iop(measurements: np.ndarray) -> float:
         IOP_safe = (Σ IOP_i - IOP_min - IOP_max) / (n - 2)
     
     Args:
-        measurements: Array of IOP measurements
+        measurements: Array of at least 3 IOP measurements
+        stats: Precomputed statistics (built from measurements if omitted)
         
     Returns:
         Safe IOP value in mmHg
@@ -31,15 +36,9 @@ def calculate_safe_iop(measurements: np.ndarray) -> float:
         - European Glaucoma Society Guidelines
         - Robust statistics methodology
     """
-    n = len(measurements)
-    
-    if n < 3:
-        return round(np.mean(measurements), 1)
-    
-    total_sum = np.sum(measurements)
-    min_val = np.min(measurements)
-    max_val = np.max(measurements)
+    if stats is None:
+        stats = IOPStats.from_measurements(measurements)
     
-    safe_iop = (total_sum - min_val - max_val) / (n - 2)
+    safe_iop = (stats.total - stats.minimum - stats.maximum) / (stats.n - 2)
     
-    return round(safe_iop, 1)
+    return safe_iop
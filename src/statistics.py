@@ -7,45 +7,169 @@ Calculates statistical measures for IOP measurements.
 Author: edujbarrios
 """
 
+import math
 import numpy as np
-from typing import Tuple
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
 
+from _util import round1, round2
 
-def get_range(measurements: np.ndarray) -> Tuple[float, float]:
+
+def _quantile_sorted(values: List[float], q: float) -> float:
+    """
+    Linearly interpolated quantile of an ascending list (np.percentile's
+    default method), read by index without NumPy's generic dispatch.
+    
+    Args:
+        values: Non-empty list sorted in ascending order
+        q: Quantile in [0, 1]
+        
+    Returns:
+        Quantile value
+    """
+    position = q * (len(values) - 1)
+    lower = int(position)
+    if lower + 1 >= len(values):
+        return values[lower]
+    return values[lower] + (position - lower) * (values[lower + 1] - values[lower])
+
+
+@dataclass(frozen=True)
+class IOPStats:
+    """
+    Derived quantities shared by all IOP estimators.
+    
+    Computed once from the sorted measurements so estimators read cached
+    scalars instead of re-sorting or re-reducing the same array.
+    
+    Attributes:
+        sorted_values: Measurements sorted in ascending order
+        n: Number of measurements
+        minimum: Smallest measurement
+        maximum: Largest measurement
+        total: Sum of measurements
+        total_sq: Sum of squared measurements
+        median: Median measurement
+        q1: First quartile (linear interpolation, as np.percentile)
+        q3: Third quartile (linear interpolation, as np.percentile)
+    """
+    sorted_values: np.ndarray
+    n: int
+    minimum: float
+    maximum: float
+    total: float
+    total_sq: float
+    median: float
+    q1: float
+    q3: float
+    
+    @classmethod
+    def from_sorted(cls, sorted_values: np.ndarray) -> 'IOPStats':
+        """
+        Build statistics from measurements already sorted ascending.
+        
+        Args:
+            sorted_values: Sorted, contiguous float64 array of IOP
+                measurements
+            
+        Returns:
+            IOPStats instance
+        """
+        # The compiled kernels read this array directly, without copying
+        assert (sorted_values.dtype == np.float64
+                and sorted_values.flags.c_contiguous)
+        
+        # Plain Python reductions beat NumPy dispatch for a handful of values
+        values = sorted_values.tolist()
+        n = len(values)
+        middle = n // 2
+        if n % 2:
+            median = values[middle]
+        else:
+            median = (values[middle - 1] + values[middle]) / 2
+        q1 = _quantile_sorted(values, 0.25)
+        q3 = _quantile_sorted(values, 0.75)
+        
+        return cls(
+            sorted_values=sorted_values,
+            n=n,
+            minimum=values[0],
+            maximum=values[-1],
+            total=sum(values),
+            total_sq=sum(value * value for value in values),
+            median=median,
+            q1=q1,
+            q3=q3
+        )
+    
+    @classmethod
+    def from_measurements(cls, measurements: np.ndarray) -> 'IOPStats':
+        """
+        Build statistics from measurements in any order.
+        
+        Args:
+            measurements: Array of IOP measurements
+            
+        Returns:
+            IOPStats instance
+        """
+        return cls.from_sorted(np.sort(np.asarray(measurements, dtype=np.float64)))
+
+
+def get_range(measurements: np.ndarray,
+              stats: Optional[IOPStats] = None) -> Tuple[float, float]:
     """
     Get minimum and maximum values.
     
     Args:
         measurements: Array of IOP measurements
+        stats: Precomputed statistics (built from measurements if omitted)
         
     Returns:
         Tuple of (min, max) IOP values
     """
-    return (round(np.min(measurements), 1), 
-            round(np.max(measurements), 1))
+    if stats is None:
+        stats = IOPStats.from_measurements(measurements)
+    
+    return (round1(stats.minimum), 
+            round1(stats.maximum))
 
 
-def get_variability(measurements: np.ndarray) -> float:
+def get_variability(measurements: np.ndarray,
+                    stats: Optional[IOPStats] = None) -> float:
     """
     Calculate range of measurements (max - min).
     
     Args:
         measurements: Array of IOP measurements
+        stats: Precomputed statistics (built from measurements if omitted)
         
     Returns:
         Variability in mmHg
     """
-    return round(np.max(measurements) - np.min(measurements), 1)
+    if stats is None:
+        stats = IOPStats.from_measurements(measurements)
+    
+    return round1(stats.maximum - stats.minimum)
 
 
-def get_standard_deviation(measurements: np.ndarray) -> float:
+def get_standard_deviation(measurements: np.ndarray,
+                           stats: Optional[IOPStats] = None) -> float:
     """
     Calculate standard deviation of measurements.
     
     Args:
         measurements: Array of IOP measurements
+        stats: Precomputed statistics (built from measurements if omitted)
         
     Returns:
         Standard deviation in mmHg
     """
-    return round(np.std(measurements, ddof=1), 2)
+    if stats is None:
+        stats = IOPStats.from_measurements(measurements)
+    
+    n = stats.n
+    variance = (stats.total_sq - stats.total * stats.total / n) / (n - 1)
+    
+    # Guard against tiny negative values from cancellation
+    return round2(math.sqrt(max(variance, 0.0)))
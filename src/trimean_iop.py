@@ -9,9 +9,13 @@ Author: edujbarrios
 """
 
 import numpy as np
+from typing import Optional
 
+from statistics import IOPStats
 
-def calculate_trimean_iop(measurements: np.ndarray) -> float:
+
+def calculate_trimean_iop(measurements: np.ndarray,
+                          stats: Optional[IOPStats] = None) -> float:
     """
     Calculate Trimean IOP using Tukey's Trimean method.
     
@@ -24,6 +28,7 @@ def calculate_trimean_iop(measurements: np.ndarray) -> float:
     
     Args:
         measurements: Array of IOP measurements
+        stats: Precomputed statistics (built from measurements if omitted)
         
     Returns:
         Trimean IOP value in mmHg
@@ -33,10 +38,10 @@ def calculate_trimean_iop(measurements: np.ndarray) -> float:
         - Balances median robustness with quartile context
         - Optimal for post-surgical and keratoconus patients
     """
-    q1 = np.percentile(measurements, 25)
-    median = np.median(measurements)
-    q3 = np.percentile(measurements, 75)
+    if stats is None:
+        stats = IOPStats.from_measurements(measurements)
     
-    trimean = (q1 + 2 * median + q3) / 4
+    # Quartiles and median come precomputed from the shared sort
+    trimean = (stats.q1 + 2 * stats.median + stats.q3) / 4
     
-    return round(trimean, 1)
+    return trimean
@@ -7,11 +7,13 @@ Handles validation of IOP measurement inputs.
 Author: edujbarrios
 """
 
-from typing import List
+import numpy as np
+from typing import Sequence, Union
 from config import MIN_MEASUREMENTS, MIN_IOP_VALUE, MAX_IOP_VALUE
+from kernels import first_out_of_range
 
 
-def parse_iop_input(input_string: str) -> List[float]:
+def parse_iop_input(input_string: str) -> np.ndarray:
     """
     Parse and validate comma-separated IOP values.
     
@@ -19,7 +21,7 @@ def parse_iop_input(input_string: str) -> List[float]:
         input_string: String containing comma-separated numbers
         
     Returns:
-        List of validated float values
+        Array of validated float values
         
     Raises:
         ValueError: If input cannot be parsed or values are invalid
@@ -27,35 +29,50 @@ def parse_iop_input(input_string: str) -> List[float]:
     if not input_string or not input_string.strip():
         raise ValueError("Input cannot be empty")
     
+    # NumPy converts the split fields (surrounding whitespace allowed) in
+    # one C-level pass; empty fields are only filtered out if that fails
+    fields = input_string.split(',')
     try:
-        # Split by comma and convert to float
-        values = [float(x.strip()) for x in input_string.split(',') if x.strip()]
-        
-        if not values:
-            raise ValueError("No valid values found in input")
-        
-        # Validate each value
-        for val in values:
-            if val < MIN_IOP_VALUE or val > MAX_IOP_VALUE:
-                raise ValueError(
-                    f"IOP value {val} is out of acceptable range "
-                    f"({MIN_IOP_VALUE}-{MAX_IOP_VALUE} mmHg)"
-                )
-        
-        return values
-        
-    except ValueError as e:
-        if "could not convert" in str(e):
+        values = np.array(fields, dtype=np.float64)
+    except ValueError:
+        fields = [x for x in fields if x and not x.isspace()]
+        try:
+            values = np.array(fields, dtype=np.float64)
+        except ValueError:
             raise ValueError("Invalid number format. Use comma-separated numeric values.")
-        raise
+    
+    validate_measurement_range(values)
+    return values
+
+
+def validate_measurement_range(measurements: np.ndarray) -> None:
+    """
+    Validate that measurements are present and within the IOP range.
+    
+    Args:
+        measurements: Array of IOP measurements
+        
+    Raises:
+        ValueError: If no values are given or any value is out of range
+    """
+    if measurements.size == 0:
+        raise ValueError("No valid values found in input")
+    
+    # One compiled scan (NaN counts as out of range)
+    index = first_out_of_range(measurements, MIN_IOP_VALUE, MAX_IOP_VALUE)
+    if index >= 0:
+        raise ValueError(
+            f"IOP value {measurements[index]} is out of acceptable "
+            f"range ({MIN_IOP_VALUE}-{MAX_IOP_VALUE} mmHg)"
+        )
 
 
-def validate_measurement_count(measurements: List[float]) -> None:
+def validate_measurement_count(measurements: np.ndarray) -> None:
     """
     Validate that sufficient measurements are provided.
     
     Args:
-        measurements: List of IOP measurements
+        measurements: Array of IOP measurements
         
     Raises:
         ValueError: If insufficient measurements
@@ -67,19 +84,38 @@ def validate_measurement_count(measurements: List[float]) -> None:
         )
 
 
-def validate_measurements(input_string: str) -> List[float]:
+def validate_measurements(
+        measurements: Union[str, Sequence[float], np.ndarray]) -> np.ndarray:
     """
     Complete validation pipeline for IOP measurements.
     
+    Numeric input (array, list or tuple) skips string parsing and is only
+    range- and count-checked.
+    
     Args:
-        input_string: Raw input string
+        measurements: Raw comma-separated input string, or numeric values
         
     Returns:
-        Validated list of measurements
+        Validated contiguous float64 array of measurements
         
     Raises:
-        ValueError: If validation fails
+        ValueError: If validation fails, including input that is neither
+            a string nor an array, list or tuple
     """
-    measurements = parse_iop_input(input_string)
+    if isinstance(measurements, str):
+        measurements = parse_iop_input(measurements)
+    elif isinstance(measurements, (np.ndarray, list, tuple)):
+        try:
+            values = np.asarray(measurements, dtype=np.float64)
+        except (TypeError, ValueError):
+            raise ValueError("Invalid number format. Use numeric values.")
+        # Checked before ascontiguousarray, which promotes 0-d input to 1-d
+        if values.ndim != 1:
+            raise ValueError("Measurements must be a flat sequence of values")
+        measurements = np.ascontiguousarray(values)
+        validate_measurement_range(measurements)
+    else:
+        raise ValueError("Invalid number format. Use comma-separated numeric values.")
+    
     validate_measurement_count(measurements)
     return measurements
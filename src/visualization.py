@@ -7,56 +7,181 @@ Handles all plotting and data visualization.
 Author: edujbarrios
 """
 
-import matplotlib.pyplot as plt
+import threading
 import numpy as np
-from typing import Dict, List
-from config import PLOT_STYLE, CLINICAL_ZONES
+from matplotlib import rc_context
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from typing import Dict, List, Optional
+from config import PLOT_STYLE, CLINICAL_ZONES, FIGURE_POOL_SIZE
+from statistics import IOPStats
 
 
-def create_visualization(measurements: List[float], results: Dict[str, float]):
+# Dark medical theme, applied through rcParams while artists are created
+# instead of styling each spine, tick and label individually
+_MEDICAL_RC = {
+    'figure.facecolor': '#0e1117',
+    'axes.facecolor': '#262730',
+    'axes.edgecolor': (250 / 255, 250 / 255, 250 / 255, 0.3),
+    'axes.labelcolor': '#fafafa',
+    'axes.labelsize': 11,
+    'axes.titlecolor': '#fafafa',
+    'axes.titlesize': 12,
+    'axes.titleweight': 'bold',
+    'xtick.color': '#fafafa',
+    'ytick.color': '#fafafa',
+    'grid.color': '#fafafa',
+    'grid.linestyle': ':',
+    'grid.alpha': PLOT_STYLE['grid_alpha'],
+    'legend.fontsize': 9,
+    'legend.facecolor': '#262730',
+    'legend.edgecolor': '#fafafa',
+    'legend.labelcolor': '#fafafa',
+}
+
+
+# Released figure skeletons by measurement count. A skeleton is handed to
+# one caller at a time and only returns here via release_visualization, so
+# figures are never shared between threads, sessions or script reruns
+_SKELETON_POOL: Dict[int, list] = {}
+_POOL_LOCK = threading.Lock()
+
+# rc_context swaps the process-wide rcParams; serialize skeleton builds so
+# concurrent threads cannot interleave and restore each other's settings
+_RC_LOCK = threading.Lock()
+
+
+# Reference lines on the measurement plot: (results key, label, line style)
+_REFERENCE_LINES = (
+    ('safe_iop', 'Safe IOP', dict(color=PLOT_STYLE['safe_iop_color'], linestyle='--',
+                                  linewidth=2.5, alpha=0.8, zorder=2)),
+    ('mean_iop', 'Mean', dict(color=PLOT_STYLE['mean_color'], linestyle=':',
+                              linewidth=1.5, alpha=0.6, zorder=1)),
+    ('possible_iop', 'Median', dict(color=PLOT_STYLE['median_color'], linestyle=':',
+                                    linewidth=1.5, alpha=0.6, zorder=1)),
+)
+
+
+def create_visualization(measurements: np.ndarray, results: Dict[str, float],
+                         stats: Optional[IOPStats] = None):
     """
     Create comprehensive visualization of IOP measurements.
     
+    The figure skeleton (axes, styling, clinical zones) is taken from a
+    process-wide pool when a released one with the same measurement count
+    is available, and built otherwise; each call only updates the data
+    artists. The returned figure belongs to the caller until it is passed
+    to release_visualization, after which it must no longer be used.
+    
     Args:
-        measurements: List of IOP measurements
+        measurements: Array of IOP measurements
         results: Dictionary of calculated results
+        stats: Precomputed statistics (built from measurements if omitted)
         
     Returns:
         Matplotlib figure object
     """
-    fig, (ax1, ax2) = plt.subplots(
-        1, 2, 
-        figsize=PLOT_STYLE['figure_size'],
-        dpi=PLOT_STYLE['dpi']
-    )
+    if stats is None:
+        stats = IOPStats.from_measurements(measurements)
     
-    # Configure dark background for medical professionalism
-    fig.patch.set_facecolor('#0e1117')
-    ax1.set_facecolor('#262730')
-    ax2.set_facecolor('#262730')
+    fig, ax1, ax2, artists = _acquire_skeleton(len(measurements))
     
-    _plot_measurements(ax1, measurements, results)
-    _plot_distribution(ax2, measurements)
+    _plot_measurements(ax1, measurements, results, artists)
+    _plot_distribution(ax2, stats, artists)
     
-    plt.tight_layout()
     return fig
 
 
-def _plot_measurements(ax, measurements: List[float], results: Dict[str, float]):
+def release_visualization(fig) -> None:
     """
-    Create scatter plot of measurements with reference lines.
+    Return a figure from create_visualization to the pool for reuse.
+    
+    Call once the figure has been rendered (e.g. after st.pyplot); later
+    calls from any thread or script rerun may then redraw it. Figures that
+    are never released are simply garbage collected.
     
     Args:
-        ax: Matplotlib axis object
-        measurements: List of IOP measurements
-        results: Dictionary of calculated results
+        fig: Figure returned by create_visualization
+    """
+    pool_entry = getattr(fig, '_iop_skeleton', None)
+    if pool_entry is None:
+        return
+    
+    n_measurements, skeleton = pool_entry
+    with _POOL_LOCK:
+        idle = _SKELETON_POOL.setdefault(n_measurements, [])
+        pooled = sum(len(skeletons) for skeletons in _SKELETON_POOL.values())
+        if pooled < FIGURE_POOL_SIZE and all(s is not skeleton for s in idle):
+            idle.append(skeleton)
+
+
+def _acquire_skeleton(n_measurements: int):
+    """
+    Take a released figure skeleton from the pool, or build a new one.
+    
+    Args:
+        n_measurements: Number of measurements to be plotted
+        
+    Returns:
+        Tuple of (figure, measurement axis, distribution axis, artists)
     """
-    x_pos = range(1, len(measurements) + 1)
+    with _POOL_LOCK:
+        idle = _SKELETON_POOL.get(n_measurements)
+        if idle:
+            return idle.pop()
     
-    # Plot measurements
-    ax.scatter(
-        x_pos, 
-        measurements, 
+    # Styles are read from rcParams when artists are created, so the
+    # theme is only needed while building
+    with _RC_LOCK, rc_context(_MEDICAL_RC):
+        skeleton = _build_figure_skeleton(n_measurements)
+    # Remember the pool key on the figure for release_visualization
+    skeleton[0]._iop_skeleton = (n_measurements, skeleton)
+    return skeleton
+
+
+def _build_figure_skeleton(n_measurements: int):
+    """
+    Build the static parts of the figure for a given measurement count.
+    
+    Args:
+        n_measurements: Number of measurements to be plotted
+        
+    Returns:
+        Tuple of (figure, measurement axis, distribution axis, artists),
+        where artists holds the data artists updated on each call
+    """
+    # Object-oriented Agg figure: no pyplot global state or figure manager.
+    # Constrained layout is resolved at draw time, replacing tight_layout
+    fig = Figure(
+        figsize=PLOT_STYLE['figure_size'],
+        dpi=PLOT_STYLE['dpi'],
+        layout='constrained'
+    )
+    FigureCanvasAgg(fig)
+    ax1, ax2 = fig.subplots(1, 2)
+    
+    artists = {'boxplot': None}
+    artists.update(_build_measurements_axis(ax1, n_measurements))
+    _build_distribution_axis(ax2)
+    
+    return fig, ax1, ax2, artists
+
+
+def _build_measurements_axis(ax, n_measurements: int) -> Dict[str, object]:
+    """
+    Create the scatter and reference-line artists with placeholder data.
+    
+    Args:
+        ax: Matplotlib axis object
+        n_measurements: Number of measurements to be plotted
+        
+    Returns:
+        Dictionary with the 'scatter' collection, the reference 'lines'
+        and their 'legend'
+    """
+    scatter = ax.scatter(
+        np.arange(1, n_measurements + 1), 
+        np.zeros(n_measurements), 
         s=100, 
         alpha=0.7, 
         color=PLOT_STYLE['scatter_color'],
@@ -67,57 +192,61 @@ def _plot_measurements(ax, measurements: List[float], results: Dict[str, float])
     )
     
     # Reference lines
-    ax.axhline(
-        y=results['safe_iop'], 
-        color=PLOT_STYLE['safe_iop_color'], 
-        linestyle='--', 
-        linewidth=2.5,
-        alpha=0.8,
-        label=f"Safe IOP: {results['safe_iop']} mmHg",
-        zorder=2
-    )
+    lines = [ax.axhline(y=0, **style) for _, _, style in _REFERENCE_LINES]
     
-    ax.axhline(
-        y=results['mean_iop'], 
-        color=PLOT_STYLE['mean_color'], 
-        linestyle=':', 
-        linewidth=1.5,
-        alpha=0.6,
-        label=f"Mean: {results['mean_iop']} mmHg",
-        zorder=1
-    )
+    # Labels (colors and sizes come from _MEDICAL_RC)
+    ax.set_xlabel('Measurement Number')
+    ax.set_ylabel('IOP (mmHg)')
+    ax.set_title('IOP Measurements with Estimates')
+    ax.grid(True)
     
-    ax.axhline(
-        y=results['possible_iop'], 
-        color=PLOT_STYLE['median_color'], 
-        linestyle=':', 
-        linewidth=1.5,
-        alpha=0.6,
-        label=f"Median: {results['possible_iop']} mmHg",
-        zorder=1
-    )
+    # Legend texts are filled in per call; 'best' is resolved at draw time
+    legend = ax.legend([scatter] + lines,
+                       ['Measurements'] + [name for _, name, _ in _REFERENCE_LINES],
+                       loc='best')
+    
+    return {'scatter': scatter, 'lines': lines, 'legend': legend}
+
+
+def _plot_measurements(ax, measurements: np.ndarray, results: Dict[str, float],
+                       artists: Dict[str, object]):
+    """
+    Update scatter plot of measurements with reference lines.
+    
+    Args:
+        ax: Matplotlib axis object
+        measurements: Array of IOP measurements
+        results: Dictionary of calculated results
+        artists: Data artists from the figure skeleton
+    """
+    x_pos = np.arange(1, len(measurements) + 1)
+    offsets = np.column_stack((x_pos, measurements))
+    artists['scatter'].set_offsets(offsets)
+    
+    labels = ['Measurements']
+    reference_values = []
+    for line, (key, name, _) in zip(artists['lines'], _REFERENCE_LINES):
+        line.set_ydata([results[key], results[key]])
+        labels.append(f"{name}: {results[key]:.1f} mmHg")
+        reference_values.append(results[key])
     
-    # Styling
-    ax.set_xlabel('Measurement Number', fontsize=11, color='#fafafa')
-    ax.set_ylabel('IOP (mmHg)', fontsize=11, color='#fafafa')
-    ax.set_title('IOP Measurements with Estimates', fontsize=12, fontweight='bold', color='#fafafa')
-    ax.legend(loc='best', fontsize=9, facecolor='#262730', edgecolor='#fafafa', labelcolor='#fafafa')
-    ax.grid(True, alpha=PLOT_STYLE['grid_alpha'], color='#fafafa', linestyle=':')
-    ax.tick_params(colors='#fafafa')
+    # Collections are not covered by relim, so reset the data limits
+    # from the points and reference levels directly
+    ax.ignore_existing_data_limits = True
+    ax.update_datalim(offsets)
+    ax.update_datalim(np.column_stack((np.ones(len(reference_values)), reference_values)))
+    ax.autoscale_view()
     
-    # Set spine colors
-    for spine in ax.spines.values():
-        spine.set_edgecolor('#fafafa')
-        spine.set_alpha(0.3)
+    for text, label in zip(artists['legend'].get_texts(), labels):
+        text.set_text(label)
 
 
-def _plot_distribution(ax, measurements: List[float]):
+def _build_distribution_axis(ax):
     """
-    Create box plot showing distribution with clinical zones.
+    Draw clinical zones, styling and zone legend for the box plot axis.
     
     Args:
         ax: Matplotlib axis object
-        measurements: List of IOP measurements
     """
     # Clinical zone backgrounds
     for zone_name, zone_data in CLINICAL_ZONES.items():
@@ -130,12 +259,73 @@ def _plot_distribution(ax, measurements: List[float]):
             zorder=0
         )
     
-    # Box plot
-    bp = ax.boxplot(
-        measurements, 
+    # Labels (colors and sizes come from _MEDICAL_RC)
+    ax.set_ylabel('IOP (mmHg)')
+    ax.set_title('Distribution Analysis')
+    ax.set_xlim(0.5, 1.5)
+    ax.set_xticks([1], [''])
+    ax.grid(True, axis='y')
+    
+    # Legend for zones
+    from matplotlib.patches import Patch
+    legend_elements = [
+        Patch(facecolor=CLINICAL_ZONES['hypotony']['color'], alpha=0.3, label='Hypotony Zone'),
+        Patch(facecolor=CLINICAL_ZONES['normal']['color'], alpha=0.3, label='Normal Zone'),
+        Patch(facecolor=CLINICAL_ZONES['elevated']['color'], alpha=0.3, label='Elevated Zone')
+    ]
+    ax.legend(handles=legend_elements, loc='upper right')
+
+
+def _box_stats(stats: IOPStats) -> List[Dict[str, object]]:
+    """
+    Box plot statistics from the cached quartiles, for Axes.bxp.
+    
+    Whiskers follow the 1.5·IQR rule of Axes.boxplot: they reach the most
+    extreme measurements within 1.5·IQR of the box, and anything beyond
+    is drawn as a flier.
+    
+    Args:
+        stats: Precomputed statistics of the measurements
+        
+    Returns:
+        Single-element list of box statistics
+    """
+    values = stats.sorted_values
+    iqr = stats.q3 - stats.q1
+    inside = values[(values >= stats.q1 - 1.5 * iqr) & (values <= stats.q3 + 1.5 * iqr)]
+    
+    return [{
+        'med': stats.median,
+        'q1': stats.q1,
+        'q3': stats.q3,
+        'whislo': min(inside[0], stats.q1),
+        'whishi': max(inside[-1], stats.q3),
+        'fliers': values[(values < inside[0]) | (values > inside[-1])]
+    }]
+
+
+def _plot_distribution(ax, stats: IOPStats, artists: Dict[str, object]):
+    """
+    Replace the box plot showing the measurement distribution.
+    
+    Args:
+        ax: Matplotlib axis object
+        stats: Precomputed statistics of the measurements
+        artists: Data artists from the figure skeleton
+    """
+    # Remove the previous call's box plot, keeping the zones
+    if artists['boxplot'] is not None:
+        for artist_list in artists['boxplot'].values():
+            for artist in artist_list:
+                artist.remove()
+    
+    # Box plot drawn from the cached quartiles, without re-sorting
+    artists['boxplot'] = ax.bxp(
+        _box_stats(stats), 
         vert=True, 
         patch_artist=True,
         widths=0.6,
+        manage_ticks=False,
         boxprops=dict(facecolor='#1f77b4', alpha=0.7, edgecolor='white', linewidth=1.5),
         medianprops=dict(color='#ff4444', linewidth=2.5),
         whiskerprops=dict(linewidth=1.5, color='white'),
@@ -143,24 +333,5 @@ def _plot_distribution(ax, measurements: List[float]):
         flierprops=dict(marker='o', markerfacecolor='#ff4444', markersize=8, alpha=0.6)
     )
     
-    # Styling
-    ax.set_ylabel('IOP (mmHg)', fontsize=11, color='#fafafa')
-    ax.set_title('Distribution Analysis', fontsize=12, fontweight='bold', color='#fafafa')
-    ax.set_xticklabels([''], color='#fafafa')
-    ax.grid(True, alpha=PLOT_STYLE['grid_alpha'], axis='y', color='#fafafa', linestyle=':')
-    ax.tick_params(colors='#fafafa')
-    
-    # Legend for zones
-    from matplotlib.patches import Patch
-    legend_elements = [
-        Patch(facecolor=CLINICAL_ZONES['hypotony']['color'], alpha=0.3, label='Hypotony Zone'),
-        Patch(facecolor=CLINICAL_ZONES['normal']['color'], alpha=0.3, label='Normal Zone'),
-        Patch(facecolor=CLINICAL_ZONES['elevated']['color'], alpha=0.3, label='Elevated Zone')
-    ]
-    ax.legend(handles=legend_elements, loc='upper right', fontsize=9, 
-             facecolor='#262730', edgecolor='#fafafa', labelcolor='#fafafa')
-    
-    # Set spine colors
-    for spine in ax.spines.values():
-        spine.set_edgecolor('#fafafa')
-        spine.set_alpha(0.3)
+    ax.relim()
+    ax.autoscale_view(scalex=False)
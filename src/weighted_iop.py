@@ -9,9 +9,14 @@ Author: edujbarrios
 """
 
 import numpy as np
+from typing import Optional
 
+from statistics import IOPStats
+from kernels import weighted_mean
 
-def calculate_weighted_iop(measurements: np.ndarray) -> float:
+
+def calculate_weighted_iop(measurements: np.ndarray,
+                           stats: Optional[IOPStats] = None) -> float:
     """
     Calculate Weighted Mean IOP by consistency.
     
@@ -25,6 +30,7 @@ def calculate_weighted_iop(measurements: np.ndarray) -> float:
     
     Args:
         measurements: Array of IOP measurements
+        stats: Precomputed statistics (built from measurements if omitted)
         
     Returns:
         Weighted mean IOP value in mmHg
@@ -36,12 +42,8 @@ def calculate_weighted_iop(measurements: np.ndarray) -> float:
         - Adaptive to measurement consistency
         - Useful for diurnal IOP fluctuation patterns
     """
-    median = np.median(measurements)
-    
-    # Calculate weights based on distance from median
-    weights = 1.0 / (1.0 + np.abs(measurements - median))
-    
-    # Weighted average
-    weighted_mean = np.sum(weights * measurements) / np.sum(weights)
+    if stats is None:
+        stats = IOPStats.from_measurements(measurements)
     
-    return round(weighted_mean, 1)
+    # Weights and both sums in one pass, around the cached median
+    return weighted_mean(stats.sorted_values, stats.median)
@@ -9,9 +9,13 @@ Author: edujbarrios
 """
 
 import numpy as np
+from typing import Optional
 
+from statistics import IOPStats
 
-def calculate_winsorized_iop(measurements: np.ndarray) -> float:
+
+def calculate_winsorized_iop(measurements: np.ndarray,
+                             stats: Optional[IOPStats] = None) -> float:
     """
     Calculate Winsorized Mean IOP.
     
@@ -25,6 +29,8 @@ def calculate_winsorized_iop(measurements: np.ndarray) -> float:
     
     Args:
         measurements: Array of IOP measurements
+        stats: Precomputed statistics (the extremes are found with
+            np.partition if omitted)
         
     Returns:
         Winsorized mean IOP value in mmHg
@@ -35,15 +41,23 @@ def calculate_winsorized_iop(measurements: np.ndarray) -> float:
         - Smooths corneal hydration effects
         - Better for sequential daily measurements
     """
-    if len(measurements) < 3:
-        return round(np.mean(measurements), 1)
+    if stats is None:
+        # Only the two smallest and two largest values are needed, so
+        # partition around them (O(n)) rather than fully sorting
+        arr = np.asarray(measurements, dtype=np.float64)
+        n = arr.size
+        if n < 3:
+            return arr.mean()
+        part = np.partition(arr, (1, n - 2))
+        return (part.sum() - part[0] - part[-1] + part[1] + part[n - 2]) / n
     
-    sorted_data = np.sort(measurements)
-    n = len(sorted_data)
+    if stats.n < 3:
+        return stats.total / stats.n
     
-    # Replace extremes with adjacent values
-    winsorized = sorted_data.copy()
-    winsorized[0] = sorted_data[1]      # Replace min with 2nd smallest
-    winsorized[-1] = sorted_data[-2]    # Replace max with 2nd largest
+    # Replacing the extremes with their neighbours only shifts the sum,
+    # so correct the cached total instead of building a winsorized copy
+    values = stats.sorted_values
+    corrected = (stats.total - stats.minimum - stats.maximum
+                 + values[1] + values[-2])
     
-    return round(np.mean(winsorized), 1)
+    return float(corrected) / stats.n
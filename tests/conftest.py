@@ -0,0 +1,10 @@
+"""
+Test configuration: makes the modules in src/ importable, as app.py does.
+
+Author: edujbarrios
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
@@ -0,0 +1,46 @@
+"""
+Tests for the IOPCalculator batch API.
+
+Author: edujbarrios
+"""
+
+import numpy as np
+import pytest
+
+from iop_calculator import IOPCalculator
+
+
+def _padded_batch(rng, n_patients, max_measurements):
+    """Random patients with 3..max_measurements values, NaN-padded in random cells."""
+    rows = [np.round(rng.uniform(8, 40, rng.integers(3, max_measurements + 1)), 1)
+            for _ in range(n_patients)]
+    matrix = np.full((n_patients, max_measurements), np.nan)
+    for i, row in enumerate(rows):
+        matrix[i, :len(row)] = row
+        matrix[i] = rng.permutation(matrix[i])
+    return rows, matrix
+
+
+@pytest.mark.parametrize('max_measurements', [5, 11, 70])
+def test_padded_batch_matches_per_patient_calculate_all(max_measurements):
+    rng = np.random.default_rng(max_measurements)
+    rows, matrix = _padded_batch(rng, 300, max_measurements)
+    
+    batch = IOPCalculator.calculate_batch(matrix)
+    
+    for i, row in enumerate(rows):
+        expected = IOPCalculator(row).calculate_all()
+        for key, value in expected.items():
+            assert batch[key][i] == pytest.approx(value, abs=1e-9), key
+
+
+def test_padded_batch_rejects_rows_with_fewer_than_three_values():
+    matrix = np.array([[12.0, 14.0, np.nan], [12.0, 14.0, 13.0]])
+    with pytest.raises(ValueError):
+        IOPCalculator.calculate_batch(matrix)
+
+
+def test_batch_rejects_infinite_values():
+    matrix = np.array([[12.0, 14.0, np.inf, np.nan], [12.0, 14.0, 13.0, 15.0]])
+    with pytest.raises(ValueError):
+        IOPCalculator.calculate_batch(matrix)
@@ -0,0 +1,53 @@
+"""
+Tests for the statistics kernels.
+
+Author: edujbarrios
+"""
+
+import itertools
+
+import numpy as np
+import pytest
+
+from kernels import (
+    _SORTING_NETWORKS, _apply_network, _weighted_sum, sort_measurements,
+)
+
+
+@pytest.mark.parametrize('n', sorted(_SORTING_NETWORKS))
+def test_sorting_network_sorts_all_binary_inputs(n):
+    # 0-1 principle: a comparator network sorting every 0/1 input sorts all inputs
+    network = _SORTING_NETWORKS[n]
+    for bits in itertools.product((0.0, 1.0), repeat=n):
+        values = np.array(bits)
+        _apply_network(values, network)
+        assert np.array_equal(values, np.sort(bits))
+
+
+@pytest.mark.parametrize('n', sorted(_SORTING_NETWORKS))
+def test_sorting_network_matches_np_sort_with_nan_and_inf(n):
+    rng = np.random.default_rng(n)
+    pool = np.array([1.0, 2.0, 2.5, 0.0, np.nan, np.inf, -np.inf])
+    for _ in range(500):
+        values = rng.choice(pool, n)
+        network_sorted = values.copy()
+        _apply_network(network_sorted, _SORTING_NETWORKS[n])
+        assert np.array_equal(network_sorted, np.sort(values), equal_nan=True)
+        assert np.array_equal(sort_measurements(values), np.sort(values),
+                              equal_nan=True)
+
+
+def test_sort_measurements_keeps_nan():
+    result = sort_measurements(np.array([3.0, np.nan, 1.0, 2.0]))
+    assert np.array_equal(result, [1.0, 2.0, 3.0, np.nan], equal_nan=True)
+
+
+@pytest.mark.parametrize('n', range(1, 129))
+def test_weighted_sum_matches_np_sum_within_one_block(n):
+    rng = np.random.default_rng(n)
+    for _ in range(10):
+        values = np.sort(np.round(rng.uniform(8, 40, n), 1))
+        median = float(np.median(values))
+        weights = 1.0 / (1.0 + np.abs(values - median))
+        expected = np.sum(weights * values) / np.sum(weights)
+        assert _weighted_sum(values, median) == expected